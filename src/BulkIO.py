@@ -0,0 +1,297 @@
+import csv
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Task import ProgressTracker, Milestone, Task
+
+# ------------------------------
+# 批量导入/导出（CSV / JSONL）
+# ------------------------------
+# 每一行描述一个任务，通过 parent_id 引用父任务；id 为空的行只声明里程碑。
+FIELDS = [
+    "milestone_id", "milestone_name",
+    "id", "parent_id", "name",
+    "time_planned", "time_spent", "progress",
+    "status", "next_steps", "start_time", "end_time",
+    "design_doc", "notes", "deliverables",
+]
+LINK_KEYS = ["design_doc", "notes", "deliverables"]
+STATUSES = ("TODO", "DOING", "DONE")
+CHUNK_SIZE = 1000
+MAX_ERRORS = 100
+
+
+class BulkImportError(ValueError):
+    """导入失败，errors 中记录 (行号, 错误信息)；stopped_at 为提前停止时最后检查的行号"""
+    def __init__(self, errors: List[Tuple[int, str]], stopped_at: Optional[int] = None):
+        self.errors = errors
+        self.stopped_at = stopped_at
+        lines = [f"第 {line} 行: {msg}" for line, msg in errors[:20]]
+        if len(errors) > 20:
+            lines.append(f"……共 {len(errors)} 处错误")
+        if stopped_at is not None:
+            lines.append(f"错误过多，第 {stopped_at} 行之后未检查")
+        super().__init__("\n".join(lines))
+
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"不支持的格式: {fmt}")
+    return fmt
+
+# ------------------------------
+# 读取
+# ------------------------------
+def iter_rows(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """逐行读取文件，生成 (行号, 行数据)"""
+    fmt = _detect_format(path, fmt)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {"__error__": f"JSON 解析失败: {e.msg}"}
+                yield line_no, row
+
+
+def _chunks(rows: Iterable[Tuple[int, dict]], size: int) -> Iterator[List[Tuple[int, dict]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _to_float(value, field: str, required: bool = False) -> Optional[float]:
+    if value is None or value == "":
+        if required:
+            return 0.0
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} 不是数字: {value!r}")
+
+
+def _validate_row(row: dict) -> Tuple[str, str, Optional[Task], Optional[str]]:
+    """校验单行并转换为对象，返回 (里程碑ID, 里程碑名称, 任务, 父任务ID)"""
+    if not isinstance(row, dict):
+        raise ValueError("行数据必须是对象")
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+
+    ms_id = str(row.get("milestone_id") or "")
+    ms_name = str(row.get("milestone_name") or "")
+    if not ms_id:
+        raise ValueError("缺少 milestone_id")
+
+    task_id = str(row.get("id") or "")
+    if not task_id:
+        return ms_id, ms_name, None, None
+
+    name = str(row.get("name") or "")
+    if not name:
+        raise ValueError("缺少任务名称")
+    progress = _to_float(row.get("progress"), "progress", required=True)
+    if not 0 <= progress <= 100:
+        raise ValueError(f"progress 超出 0-100: {progress}")
+    status = row.get("status") or "TODO"
+    if status not in STATUSES:
+        raise ValueError(f"未知状态: {status}")
+
+    task = Task(
+        name=name,
+        time_planned=_to_float(row.get("time_planned"), "time_planned", required=True),
+        time_spent=_to_float(row.get("time_spent"), "time_spent", required=True),
+        progress=int(progress) if float(progress).is_integer() else progress,
+        next_steps=str(row.get("next_steps") or ""),
+        links={key: str(row.get(key) or "") for key in LINK_KEYS},
+    )
+    task.id = task_id
+    task.status = status
+    task.start_time = _to_float(row.get("start_time"), "start_time")
+    task.end_time = _to_float(row.get("end_time"), "end_time")
+    parent_id = str(row.get("parent_id") or "") or None
+    if parent_id == task_id:
+        raise ValueError(f"父子关系成环: {task_id}")
+    return ms_id, ms_name, task, parent_id
+
+
+def _is_ancestor(candidate: Task, task: Task) -> bool:
+    current = task
+    while current is not None:
+        if current is candidate:
+            return True
+        current = current.parent
+    return False
+
+
+def import_rows(
+    tracker: ProgressTracker,
+    rows: Iterable[Tuple[int, dict]],
+    chunk_size: int = CHUNK_SIZE,
+    save: bool = True,
+    max_errors: int = MAX_ERRORS,
+) -> int:
+    """
+    批量导入任务行，返回导入的任务数。
+
+    按 chunk_size 分块读取：每块先整体校验，再把校验通过的行挂接到树上；
+    块结束时错误数达到 max_errors 即停止读取剩余行，不再为注定失败的导入继续解析。
+    父任务引用在一次遍历中解析：子任务先于父任务出现时暂存，父任务到达后再挂接。
+    全部行校验通过后才写入 tracker，并且只保存一次；否则抛出 BulkImportError。
+    """
+    errors: List[Tuple[int, str]] = []
+    milestones: Dict[str, Milestone] = {ms.id: ms for ms in tracker.milestones}
+    new_milestones: List[Milestone] = []
+    tasks: Dict[str, Task] = {}
+    task_lines: Dict[str, int] = {}
+    pending: Dict[str, List[Task]] = {}  # parent_id -> 等待挂接的子任务
+    roots: List[Tuple[Milestone, Task]] = []
+    task_milestone: Dict[str, str] = {}
+    existing_ids = set()
+    for ms in tracker.milestones:
+        stack = list(ms.tasks)
+        while stack:
+            t = stack.pop()
+            existing_ids.add(t.id)
+            stack.extend(t.subtasks)
+
+    for chunk in _chunks(rows, chunk_size):
+        # 第一步：整块校验
+        validated = []
+        for line_no, row in chunk:
+            try:
+                validated.append((line_no, _validate_row(row)))
+            except ValueError as e:
+                errors.append((line_no, str(e)))
+        last_line = chunk[-1][0]
+        del chunk
+
+        # 第二步：挂接校验通过的行
+        for line_no, (ms_id, ms_name, task, parent_id) in validated:
+            if ms_id in tracker.archived:
+                errors.append((line_no, f"里程碑已归档: {ms_id}"))
+                continue
+            milestone = milestones.get(ms_id)
+            if milestone is None:
+                milestone = Milestone(ms_name or ms_id)
+                milestone.id = ms_id
+                milestones[ms_id] = milestone
+                new_milestones.append(milestone)
+            if task is None:
+                continue
+
+            if task.id in tasks or task.id in existing_ids:
+                errors.append((line_no, f"任务 ID 重复: {task.id}"))
+                continue
+            tasks[task.id] = task
+            task_lines[task.id] = line_no
+            task_milestone[task.id] = milestone.id
+
+            if parent_id is None:
+                roots.append((milestone, task))
+            elif parent_id in tasks:
+                tasks[parent_id].add_subtask(task)
+            else:
+                pending.setdefault(parent_id, []).append(task)
+
+            # 挂接先前等待本任务的子任务
+            for child in pending.pop(task.id, []):
+                if _is_ancestor(child, task):
+                    errors.append((task_lines[child.id], f"父子关系成环: {task.id}"))
+                    continue
+                task.add_subtask(child)
+
+        if len(errors) >= max_errors:
+            errors.sort()
+            raise BulkImportError(errors, stopped_at=last_line)
+
+    for parent_id, children in pending.items():
+        for child in children:
+            errors.append((task_lines[child.id], f"找不到父任务: {parent_id}"))
+
+    for task_id, task in tasks.items():
+        if task.parent is not None and task_milestone[task.parent.id] != task_milestone[task_id]:
+            errors.append((task_lines[task_id], "父任务属于不同的里程碑"))
+
+    if errors:
+        errors.sort()
+        raise BulkImportError(errors)
+
+    tracker.milestones.extend(new_milestones)
+    for milestone, task in roots:
+        milestone.add_task(task)
+    # 文件中父任务自带的时间/进度以子任务为准
+    tracker._recalculate_rollups([task for _, task in roots])
+    if save:
+        tracker.save_data()
+    return len(tasks)
+
+
+def import_file(tracker: ProgressTracker, path: str, fmt: Optional[str] = None,
+                chunk_size: int = CHUNK_SIZE, max_errors: int = MAX_ERRORS) -> int:
+    """从 CSV/JSONL 文件批量导入"""
+    return import_rows(tracker, iter_rows(path, fmt), chunk_size=chunk_size, max_errors=max_errors)
+
+# ------------------------------
+# 导出
+# ------------------------------
+def iter_export_rows(milestones: Iterable[Milestone]) -> Iterator[dict]:
+    """按深度优先顺序逐行生成导出数据（父任务总在子任务之前）"""
+    for ms in milestones:
+        row = dict.fromkeys(FIELDS, "")
+        row["milestone_id"] = ms.id
+        row["milestone_name"] = ms.name
+        yield row
+        stack = [(t, None) for t in reversed(ms.tasks)]
+        while stack:
+            task, parent_id = stack.pop()
+            row = {
+                "milestone_id": ms.id,
+                "milestone_name": ms.name,
+                "id": task.id,
+                "parent_id": parent_id or "",
+                "name": task.name,
+                "time_planned": task.time_planned,
+                "time_spent": task.time_spent,
+                "progress": task.progress,
+                "status": task.status,
+                "next_steps": task.next_steps,
+                "start_time": "" if task.start_time is None else task.start_time,
+                "end_time": "" if task.end_time is None else task.end_time,
+            }
+            for key in LINK_KEYS:
+                row[key] = task.links.get(key, "")
+            yield row
+            stack.extend((sub, task.id) for sub in reversed(task.subtasks))
+
+
+def export_file(tracker: ProgressTracker, path: str, fmt: Optional[str] = None) -> int:
+    """流式导出到 CSV/JSONL 文件，返回写出的行数"""
+    fmt = _detect_format(path, fmt)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in iter_export_rows(tracker.milestones):
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in iter_export_rows(tracker.milestones):
+                f.write(json.dumps(row, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    return count
@@ -0,0 +1,320 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from Task import ProgressTracker, Milestone, Task
+
+# ------------------------------
+# 随机操作序列测试：加载/保存往返与汇总一致性
+# ------------------------------
+# 每一步之后检查不变量：
+#   1. 父任务的汇总值（计划/投入/进度）与按叶子任务重新计算的参考值一致
+#   2. 父引用、find_task/find_milestone 与树结构一致，ID 唯一
+#   3. to_dict -> from_dict 往返无损；save/reload 后数据完全一致
+# reload_stale 模拟旧文件中父任务带有未汇总的值，验证 load_data 会重新计算汇总。
+# 同时检查每种操作的耗时不超过预算。
+
+# 每种操作在 BUDGET_TASKS 个任务以内时的耗时预算（秒），包括其中的 save_data。
+# 实际预算随当前任务数线性放大，并按运行开始时测得的机器速度缩放，避免在慢机器上误报。
+BUDGETS = {
+    "add_milestone": 0.05,
+    "add_task": 0.2,
+    "remove_task": 0.2,
+    "status": 0.05,
+    "progress": 0.05,
+    "save_reload": 0.5,
+    "reload_stale": 0.5,
+}
+BUDGET_TASKS = 100
+REFERENCE_BASELINE = 0.005  # 参考机器上 calibrate() 的耗时（秒）
+REGRESSION_SEEDS = (0, 1, 2)
+REGRESSION_STEPS = 300
+EPS = 1e-6
+
+
+class FuzzFailure(AssertionError):
+    """不变量或耗时预算被破坏"""
+    def __init__(self, seed: int, step: int, op: str, message: str):
+        self.seed, self.step, self.op = seed, step, op
+        super().__init__(f"seed={seed} step={step} op={op}: {message}")
+
+
+def ref_planned(task: Task) -> float:
+    """参考实现：叶子任务计划时间之和"""
+    if not task.subtasks:
+        return task.time_planned
+    return sum(ref_planned(t) for t in task.subtasks)
+
+
+def ref_spent(task: Task) -> float:
+    """参考实现：叶子任务投入时间之和"""
+    if not task.subtasks:
+        return task.time_spent
+    return sum(ref_spent(t) for t in task.subtasks)
+
+
+def ref_progress(task: Task) -> float:
+    """参考实现：按子任务计划时间加权的进度"""
+    if not task.subtasks:
+        return float(task.progress)
+    weight = sum(ref_planned(t) for t in task.subtasks)
+    if weight == 0:
+        return 0.0
+    return sum(ref_progress(t) * ref_planned(t) for t in task.subtasks) / weight
+
+
+def _close(a: float, b: float) -> bool:
+    return abs(a - b) <= EPS * max(1.0, abs(a), abs(b))
+
+
+def calibrate(repeat: int = 3) -> float:
+    """测量本机保存并重新加载 BUDGET_TASKS 个任务的耗时（取最小值），作为耗时基准"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "calibrate.json")
+        tracker = ProgressTracker(data_file)
+        milestone = Milestone("calibrate")
+        tracker.milestones.append(milestone)
+        tasks: List[Task] = []
+        for i in range(BUDGET_TASKS):
+            task = Task(f"task-{i}", time_planned=1, time_spent=0.5, progress=50)
+            if i < 4:
+                milestone.add_task(task)
+            else:
+                tasks[i // 4].add_subtask(task)
+            tasks.append(task)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tracker.save_data()
+            ProgressTracker(data_file)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Fuzzer:
+    def __init__(self, seed: int, data_file: str, budgets: Optional[Dict[str, float]] = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.data_file = data_file
+        self.budgets = budgets or BUDGETS
+        # 机器比参考机器慢时按比例放宽预算，快时保持原预算
+        self.speed = max(1.0, calibrate() / REFERENCE_BASELINE)
+        self.tracker = ProgressTracker(data_file)
+        self.clock = 1_700_000_000.0  # 固定时钟，保证 update_status 的结果可复现
+        self.step = 0
+        self.timings: Dict[str, List[float]] = {op: [] for op in self.budgets}
+        self.ops: Dict[str, Callable[[], None]] = {
+            "add_milestone": self.op_add_milestone,
+            "add_task": self.op_add_task,
+            "remove_task": self.op_remove_task,
+            "status": self.op_status,
+            "progress": self.op_progress,
+            "save_reload": self.op_save_reload,
+            "reload_stale": self.op_reload_stale,
+        }
+        self.weights = {"add_milestone": 1, "add_task": 12, "remove_task": 3,
+                        "status": 5, "progress": 5, "save_reload": 1, "reload_stale": 1}
+
+    def _time(self) -> float:
+        self.clock += self.rng.uniform(0, 4 * 3600)
+        return self.clock
+
+    def _all_tasks(self, milestone: Optional[Milestone] = None) -> List[Task]:
+        milestones = [milestone] if milestone else self.tracker.milestones
+        result = []
+        for ms in milestones:
+            stack = list(ms.tasks)
+            while stack:
+                task = stack.pop()
+                result.append(task)
+                stack.extend(task.subtasks)
+        return result
+
+    def _fail(self, op: str, message: str):
+        raise FuzzFailure(self.seed, self.step, op, message)
+
+    def budget(self, op: str, task_count: int) -> float:
+        """按当前任务数和机器速度缩放后的耗时预算"""
+        return self.budgets[op] * self.speed * max(1.0, task_count / BUDGET_TASKS)
+
+    # ------------------------------
+    # 操作
+    # ------------------------------
+    def op_add_milestone(self) -> None:
+        self.tracker.milestones.append(Milestone(f"ms-{self.step}"))
+        self.tracker.save_data()
+
+    def op_add_task(self) -> None:
+        if not self.tracker.milestones:
+            return self.op_add_milestone()
+        milestone = self.rng.choice(self.tracker.milestones)
+        tasks = self._all_tasks(milestone)
+        parent = self.rng.choice(tasks) if tasks and self.rng.random() < 0.7 else None
+        new_task = Task(
+            f"task-{self.step}",
+            time_planned=self.rng.choice([0, 0.5, 1, 2, 3, 5, 8]),
+            time_spent=self.rng.choice([0, 0, 0.25, 1, 2]),
+            progress=self.rng.randint(0, 100),
+        )
+        if parent:
+            self.tracker.add_task(parent, new_task)
+        else:
+            # 与 MilestoneWindow 添加顶层任务的流程一致
+            milestone.add_task(new_task)
+            self.tracker._propagate_time_update(new_task)
+            self.tracker.save_data()
+
+    def op_remove_task(self) -> None:
+        tasks = self._all_tasks()
+        if not tasks:
+            return
+        task = self.rng.choice(tasks)
+        if not self.tracker.remove_task(task.id):
+            self._fail("remove_task", f"删除失败: {task.id}")
+        if self.tracker.find_task(task.id) is not None:
+            self._fail("remove_task", f"删除后仍能找到任务: {task.id}")
+
+    def op_status(self) -> None:
+        tasks = self._all_tasks()
+        if not tasks:
+            return
+        task = self.rng.choice(tasks)
+        with mock.patch("Task.time.time", self._time):
+            task.update_status(self.rng.choice(["TODO", "DOING", "DONE"]))
+        self.tracker._propagate_time_update(task)
+        self.tracker.save_data()
+
+    def op_progress(self) -> None:
+        tasks = self._all_tasks()
+        if not tasks:
+            return
+        task = self.rng.choice(tasks)
+        value = self.rng.randint(-20, 120)
+        if task.has_children:
+            try:
+                task.update_progress(value)
+            except ValueError:
+                return
+            self._fail("progress", "父任务的进度被手动修改")
+        task.update_progress(value)
+        if not 0 <= task.progress <= 100:
+            self._fail("progress", f"进度超出范围: {task.progress}")
+        self.tracker._propagate_time_update(task)
+        self.tracker.save_data()
+
+    def op_save_reload(self) -> None:
+        before = json.dumps([ms.to_dict() for ms in self.tracker.milestones], sort_keys=True)
+        self.tracker.save_data()
+        self.tracker = ProgressTracker(self.data_file)
+        after = json.dumps([ms.to_dict() for ms in self.tracker.milestones], sort_keys=True)
+        if before != after:
+            self._fail("save_reload", "保存后重新加载的数据不一致")
+
+    def op_reload_stale(self) -> None:
+        self.tracker.save_data()
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        stack = [t for ms in data["milestones"] for t in ms["tasks"]]
+        while stack:
+            task = stack.pop()
+            if task["subtasks"]:
+                task["time_planned"] = self.rng.choice([0, 1, 15, 100])
+                task["time_spent"] = self.rng.choice([0, 2, 40])
+                task["progress"] = self.rng.randint(0, 100)
+                stack.extend(task["subtasks"])
+        with open(self.data_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        self.tracker = ProgressTracker(self.data_file)
+
+    # ------------------------------
+    # 不变量
+    # ------------------------------
+    def check_invariants(self, op: str) -> None:
+        seen = set()
+        for ms in self.tracker.milestones:
+            if self.tracker.find_milestone(ms.id) is not ms:
+                self._fail(op, f"find_milestone 结果不一致: {ms.id}")
+            stack = [(t, None) for t in ms.tasks]
+            while stack:
+                task, parent = stack.pop()
+                if task.id in seen:
+                    self._fail(op, f"任务 ID 重复: {task.id}")
+                seen.add(task.id)
+                if task.parent is not parent:
+                    self._fail(op, f"父引用错误: {task.name}")
+                if self.tracker.find_task(task.id) is not task:
+                    self._fail(op, f"find_task 结果不一致: {task.name}")
+                if task.has_children:
+                    if not _close(task.time_planned, ref_planned(task)):
+                        self._fail(op, f"{task.name} 计划时间 {task.time_planned} != {ref_planned(task)}")
+                    if not _close(task.time_spent, ref_spent(task)):
+                        self._fail(op, f"{task.name} 投入时间 {task.time_spent} != {ref_spent(task)}")
+                    if not _close(task.progress, ref_progress(task)):
+                        self._fail(op, f"{task.name} 进度 {task.progress} != {ref_progress(task)}")
+                if not _close(task.calculate_total_time_planned(), ref_planned(task)):
+                    self._fail(op, f"{task.name} calculate_total_time_planned 与参考值不一致")
+                if not _close(task.calculate_total_time_spent(), ref_spent(task)):
+                    self._fail(op, f"{task.name} calculate_total_time_spent 与参考值不一致")
+                if not _close(task.calculate_progress(), ref_progress(task)):
+                    self._fail(op, f"{task.name} calculate_progress 与参考值不一致")
+                stack.extend((t, task) for t in task.subtasks)
+
+            data = ms.to_dict()
+            if Milestone.from_dict(data).to_dict() != data:
+                self._fail(op, f"里程碑往返不一致: {ms.name}")
+
+    # ------------------------------
+    # 运行
+    # ------------------------------
+    def run(self, steps: int) -> Dict[str, List[float]]:
+        names = list(self.weights)
+        weights = [self.weights[name] for name in names]
+        for step in range(steps):
+            self.step = step
+            op = self.rng.choices(names, weights)[0]
+            budget = self.budget(op, len(self._all_tasks()))
+            start = time.perf_counter()
+            self.ops[op]()
+            elapsed = time.perf_counter() - start
+            self.timings[op].append(elapsed)
+            if elapsed > budget:
+                self._fail(op, f"耗时 {elapsed * 1000:.1f}ms 超出预算 {budget * 1000:.0f}ms")
+            self.check_invariants(op)
+        return self.timings
+
+
+def run(seed: int, steps: int, budgets: Optional[Dict[str, float]] = None) -> Dict[str, List[float]]:
+    """在临时目录中执行一次随机测试，失败时抛出 FuzzFailure"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        return Fuzzer(seed, os.path.join(tmp_dir, "fuzz.json"), budgets).run(steps)
+
+
+def regression(seeds=REGRESSION_SEEDS, steps: int = REGRESSION_STEPS) -> None:
+    """用固定种子回归测试，任一种子失败即抛出 FuzzFailure"""
+    for seed in seeds:
+        run(seed, steps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="随机操作序列测试")
+    parser.add_argument("--seed", type=int, default=0, help="起始随机种子")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数（种子依次递增）")
+    parser.add_argument("--steps", type=int, default=500, help="每次运行的操作数")
+    parser.add_argument("--regression", action="store_true",
+                        help=f"只运行固定种子 {REGRESSION_SEEDS} 的回归测试")
+    args = parser.parse_args()
+
+    if args.regression:
+        regression()
+        print(f"回归测试通过: seeds={REGRESSION_SEEDS}, steps={REGRESSION_STEPS}")
+        raise SystemExit(0)
+
+    for seed in range(args.seed, args.seed + args.runs):
+        timings = run(seed, args.steps)
+        worst = ", ".join(f"{op}={max(t) * 1000:.1f}ms" for op, t in timings.items() if t)
+        print(f"seed={seed} 通过，最大耗时: {worst}")
@@ -1,11 +1,17 @@
 import os
+import sys
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import webbrowser
 from typing import Optional
 
 # 导入之前定义的类（假设保存为 progress_tracker.py）
 from Task import ProgressTracker, Milestone, Task
+from Report import ReportEngine
+from Workspace import Workspace
+
+SNAPSHOT_CHECK_MS = 10 * 60 * 1000  # 检查是否需要记录报表快照的间隔
 
 # ------------------------------
 # 界面类
@@ -15,9 +21,16 @@ class MainWindow(tk.Tk):
     def __init__(self, tracker: ProgressTracker):
         super().__init__()
         self.tracker = tracker
+        self.reports = ReportEngine(tracker)
         self.title("学习进度跟踪")
         self.geometry("400x300")
         self._create_widgets()
+        self._schedule_snapshot()
+
+    def _schedule_snapshot(self):
+        """定期记录报表快照（是否写入由 ReportEngine.interval 决定），程序长时间运行时也不断档"""
+        self.reports.take_snapshot()
+        self.after(SNAPSHOT_CHECK_MS, self._schedule_snapshot)
 
     def _create_widgets(self):
         # 标题
@@ -48,10 +61,21 @@ class MainWindow(tk.Tk):
                 command=lambda ms_id=milestone.id: self._delete_milestone(ms_id)
             )
             btn_del.pack(side=tk.LEFT)
+
+            # 报表按钮
+            ttk.Button(
+                row_frame,
+                text="报表",
+                command=lambda ms_id=milestone.id: self._open_report(ms_id)
+            ).pack(side=tk.LEFT, padx=5)
         
-        # “添加里程碑”按钮
-        btn_add = ttk.Button(self, text="+ 新建里程碑", command=self._open_add_milestone_dialog)
-        btn_add.pack(side=tk.BOTTOM, pady=10)
+        # “添加里程碑”、归档按钮
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(side=tk.BOTTOM, pady=10)
+        ttk.Button(btn_frame, text="+ 新建里程碑", command=self._open_add_milestone_dialog).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="归档已完成", command=self._archive_completed).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text=f"已归档 ({len(self.tracker.archived)})",
+                   command=lambda: ArchiveWindow(self, self.tracker)).pack(side=tk.LEFT)
 
     def _open_milestone(self, milestone_id: str):
         """打开里程碑详情窗口"""
@@ -62,6 +86,22 @@ class MainWindow(tk.Tk):
         else:
             messagebox.showerror("错误", "未找到该里程碑")
 
+    def _open_report(self, milestone_id: str):
+        """打开里程碑报表窗口"""
+        milestone = self.tracker.find_milestone(milestone_id)
+        if milestone:
+            self.reports.take_snapshot()
+            ReportWindow(self, self.reports, milestone)
+        else:
+            messagebox.showerror("错误", "未找到该里程碑")
+
+    def _archive_completed(self):
+        """归档所有已完成的里程碑"""
+        ids = self.tracker.archive_completed()
+        if ids:
+            self._refresh_ui()
+        messagebox.showinfo("提示", f"已归档 {len(ids)} 个里程碑")
+
     def _open_add_milestone_dialog(self):
         """新建里程碑对话框"""
         dialog = tk.Toplevel(self)
@@ -343,10 +383,18 @@ class TaskWindow(tk.Toplevel):
         frame_time.pack(fill=tk.X, padx=10, pady=5)
         ttk.Label(frame_time, text="已投入/计划时间:").grid(row=0, column=0)
         self.time_spent_var = tk.DoubleVar(value=self.task.time_spent)
-        ttk.Entry(frame_time, textvariable=self.time_spent_var, width=8).grid(row=0, column=1)
+        entry_spent = ttk.Entry(frame_time, textvariable=self.time_spent_var, width=8)
+        entry_spent.grid(row=0, column=1)
         ttk.Label(frame_time, text="/").grid(row=0, column=2)
         self.time_planned_var = tk.DoubleVar(value=self.task.time_planned)
-        ttk.Entry(frame_time, textvariable=self.time_planned_var, width=8).grid(row=0, column=3)
+        entry_planned = ttk.Entry(frame_time, textvariable=self.time_planned_var, width=8)
+        entry_planned.grid(row=0, column=3)
+
+        # 有子任务时时间由子任务汇总，禁用输入
+        if self.task.has_children:
+            entry_spent.config(state="disabled")
+            entry_planned.config(state="disabled")
+            ttk.Label(frame_time, text="(自动计算)").grid(row=0, column=4)
 
         # 下一步计划
         ttk.Label(self, text="下一步计划:").pack(anchor=tk.W, padx=10, pady=5)
@@ -434,9 +482,10 @@ class TaskWindow(tk.Toplevel):
                 messagebox.showerror("错误", str(e))
                 return
         """保存修改到数据模型"""
-        self.task.progress = self.progress_var.get()
-        self.task.time_spent = self.time_spent_var.get()
-        self.task.time_planned = self.time_planned_var.get()
+        if not self.task.has_children:
+            # 父任务的时间和进度由子任务汇总，不接受手动修改
+            self.task.time_spent = self.time_spent_var.get()
+            self.task.time_planned = self.time_planned_var.get()
         self.task.next_steps = self.next_steps_text.get("1.0", tk.END).strip()
         self.tracker.save_data()
         messagebox.showinfo("提示", "保存成功！")
@@ -450,24 +499,268 @@ class TaskWindow(tk.Toplevel):
         """处理状态变更"""
         new_status = self.status_var.get()
         self.task.update_status(new_status)
+        self.tracker._propagate_time_update(self.task)
         self.tracker.save_data()
 
+class ArchiveWindow(tk.Toplevel):
+    """归档窗口：浏览、搜索和取消归档"""
+    def __init__(self, parent: MainWindow, tracker: ProgressTracker):
+        super().__init__(parent)
+        self.parent = parent
+        self.tracker = tracker
+        self.title("已归档里程碑")
+        self.geometry("600x400")
+        self._create_widgets()
+        self._populate(list(self.tracker.archived))
+
+    def _create_widgets(self):
+        # 搜索
+        frame_search = ttk.Frame(self)
+        frame_search.pack(fill=tk.X, padx=10, pady=10)
+        self.search_var = tk.StringVar()
+        ttk.Entry(frame_search, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(frame_search, text="搜索", command=self._search).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_search, text="取消归档", command=self._unarchive).pack(side=tk.LEFT)
+
+        self.tree = ttk.Treeview(self, columns=("progress", "time"), show="tree headings")
+        self.tree.heading("#0", text="里程碑 / 任务")
+        self.tree.heading("progress", text="进度 (%)")
+        self.tree.heading("time", text="时间 (小时)")
+        self.tree.column("#0", width=350)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        # 展开时才读取归档内容
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+
+    def _populate(self, milestone_ids: list):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for ms_id in milestone_ids:
+            info = self.tracker.archived[ms_id]
+            progress = info.get("progress")  # 早期归档的索引没有记录进度
+            item = self.tree.insert(
+                "", "end", iid=ms_id, text=info["name"],
+                values=("-" if progress is None else f"{progress:.1f}",
+                        f"{info['time_spent']:.1f}/{info['time_planned']:.1f}")
+            )
+            self.tree.insert(item, "end", text="…")  # 占位，展开时替换
+
+    def _populate_tasks(self, tasks: list, parent: str):
+        for task in tasks:
+            item = self.tree.insert(parent, "end", text=task.name,
+                                    values=(f"{task.progress}", f"{task.time_spent}/{task.time_planned}"))
+            self._populate_tasks(task.subtasks, item)
+
+    def _on_open(self, event):
+        item = self.tree.focus()
+        if item not in self.tracker.archived:
+            return
+        children = self.tree.get_children(item)
+        if len(children) == 1 and self.tree.item(children[0], "text") == "…":
+            self.tree.delete(children[0])
+            milestone = self.tracker.load_archived(item)
+            if milestone:
+                self._populate_tasks(milestone.tasks, item)
+
+    def _search(self):
+        keyword = self.search_var.get().strip()
+        if keyword:
+            self._populate(self.tracker.search_archive(keyword))
+        else:
+            self._populate(list(self.tracker.archived))
+
+    def _unarchive(self):
+        selected = self.tree.selection()
+        if not selected or selected[0] not in self.tracker.archived:
+            messagebox.showwarning("提示", "请先选择里程碑", parent=self)
+            return
+        try:
+            unarchived = self.tracker.unarchive_milestone(selected[0])
+        except ValueError as e:
+            messagebox.showerror("错误", str(e), parent=self)
+            return
+        if unarchived:
+            self.tree.delete(selected[0])
+            self.parent._refresh_ui()
+        else:
+            messagebox.showerror("错误", "取消归档失败", parent=self)
+
+class ReportWindow(tk.Toplevel):
+    """报表窗口：燃尽图、速度和估算准确度"""
+    def __init__(self, parent: tk.Tk, reports: ReportEngine, milestone: Milestone):
+        super().__init__(parent)
+        self.reports = reports
+        self.milestone = milestone
+        self.title(f"报表 - {milestone.name}")
+        self.geometry("600x450")
+        self._create_widgets()
+
+    def _create_widgets(self):
+        accuracy = self.reports.estimate_accuracy(self.milestone.id)
+        text = "估算准确度: -" if accuracy is None else f"估算准确度: {accuracy:.2f} (投入/计划)"
+        ttk.Label(self, text=text).pack(anchor=tk.W, padx=10, pady=5)
+
+        ttk.Label(self, text="燃尽图（剩余计划小时）").pack(anchor=tk.W, padx=10)
+        self.canvas_burndown = tk.Canvas(self, height=160, bg="white")
+        self.canvas_burndown.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(self, text="速度（每周投入小时）").pack(anchor=tk.W, padx=10)
+        self.canvas_velocity = tk.Canvas(self, height=160, bg="white")
+        self.canvas_velocity.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Button(self, text="导出 CSV", command=self._export_csv).pack(pady=5)
+
+        self.update_idletasks()
+        self._draw_line(self.canvas_burndown, self.reports.burndown(self.milestone.id))
+        self._draw_bars(self.canvas_velocity, self.reports.velocity(self.milestone.id))
+
+    def _draw_line(self, canvas: tk.Canvas, points: list):
+        """绘制折线"""
+        if not points:
+            return
+        width, height, pad = canvas.winfo_width(), int(canvas["height"]), 20
+        t0, t1 = points[0][0], points[-1][0]
+        top = max(v for _, v in points) or 1
+        span = (t1 - t0) or 1
+        coords = []
+        for t, v in points:
+            coords.append(pad + (t - t0) / span * (width - 2 * pad))
+            coords.append(height - pad - v / top * (height - 2 * pad))
+        if len(coords) > 2:
+            canvas.create_line(*coords, fill="blue", width=2)
+        canvas.create_text(pad, pad / 2, text=f"{top:.1f}h", anchor=tk.W)
+        canvas.create_text(width - pad, height - pad / 2,
+                           text=time.strftime("%Y-%m-%d", time.localtime(t1)), anchor=tk.E)
+
+    def _draw_bars(self, canvas: tk.Canvas, bars: list):
+        """绘制柱状图"""
+        if not bars:
+            return
+        width, height, pad = canvas.winfo_width(), int(canvas["height"]), 20
+        top = max(v for _, v in bars) or 1
+        step = (width - 2 * pad) / len(bars)
+        for i, (start, v) in enumerate(bars):
+            x = pad + i * step
+            canvas.create_rectangle(x + 2, height - pad - v / top * (height - 2 * pad),
+                                    x + step - 2, height - pad, fill="green")
+            canvas.create_text(x + step / 2, height - pad / 2,
+                               text=time.strftime("%m-%d", time.localtime(start)))
+        canvas.create_text(pad, pad / 2, text=f"{top:.1f}h", anchor=tk.W)
+
+    def _export_csv(self):
+        """导出报表 CSV"""
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv")])
+        if path:
+            self.reports.export_csv(self.milestone.id, path)
+            messagebox.showinfo("提示", "导出成功！")
+
+class WorkspaceWindow(tk.Tk):
+    """工作区汇总面板：所有项目合计，展开项目查看各里程碑"""
+    def __init__(self, workspace: Workspace):
+        super().__init__()
+        self.workspace = workspace
+        self.title(f"工作区 - {workspace.root}")
+        self.geometry("700x400")
+        self._create_widgets()
+        self._refresh()
+
+    def _create_widgets(self):
+        top = ttk.Frame(self)
+        top.pack(fill=tk.X, padx=10, pady=10)
+        self.label_totals = ttk.Label(top, text="")
+        self.label_totals.pack(side=tk.LEFT)
+        ttk.Button(top, text="刷新", command=self._refresh).pack(side=tk.RIGHT)
+
+        frame = ttk.Frame(self)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        columns = ("progress", "planned", "spent", "remaining")
+        self.tree = ttk.Treeview(frame, columns=columns, show="tree headings")
+        self.tree.heading("#0", text="项目 / 里程碑")
+        self.tree.heading("progress", text="进度 (%)")
+        self.tree.heading("planned", text="计划 (小时)")
+        self.tree.heading("spent", text="投入 (小时)")
+        self.tree.heading("remaining", text="剩余 (小时)")
+        self.tree.column("#0", width=260)
+        for col in columns:
+            self.tree.column(col, width=100)
+
+        vsb = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=vsb.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        vsb.grid(row=0, column=1, sticky="ns")
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+
+    def _refresh(self):
+        """重新读取有变化的文件并刷新列表"""
+        self.workspace.refresh()
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        for project in self.workspace.projects():
+            item = self.tree.insert(
+                "", "end", text=project["name"],
+                values=(f"{project['progress']:.1f}", f"{project['planned']:.1f}", f"{project['spent']:.1f}",
+                        f"{project['remaining']:.1f}"),
+                open=False
+            )
+            for ms in project["milestones"]:
+                self.tree.insert(
+                    item, "end", text=ms["name"],
+                    values=(f"{ms['progress']:.1f}", f"{ms['planned']:.1f}", f"{ms['spent']:.1f}",
+                            f"{ms['remaining']:.1f}")
+                )
+            archived = project["archived"]
+            if archived["milestones"]:
+                self.tree.insert(
+                    item, "end", text=f"已归档 ({archived['milestones']})",
+                    values=("-", f"{archived['planned']:.1f}", f"{archived['spent']:.1f}", "0.0")
+                )
+
+        totals = self.workspace.totals()
+        self.label_totals.config(
+            text=f"项目: {totals['projects']}  里程碑: {totals['milestones']}  "
+                 f"投入/计划: {totals['spent']:.1f}/{totals['planned']:.1f} 小时  "
+                 f"剩余: {totals['remaining']:.1f} 小时\n"
+                 f"已归档: {totals['archived_milestones']} 个里程碑  "
+                 f"投入/计划: {totals['archived_spent']:.1f}/{totals['archived_planned']:.1f} 小时"
+        )
+        if self.workspace.errors:
+            messagebox.showwarning(
+                "警告", "\n".join(f"{path}: {err}" for path, err in self.workspace.errors.items())
+            )
+
 # ------------------------------
 # 启动程序
 # ------------------------------
 if __name__ == "__main__":
 
-    # 初始化数据跟踪器
-    tracker = ProgressTracker()
+    # 传入目录时打开工作区汇总面板
+    if len(sys.argv) > 1 and os.path.isdir(sys.argv[1]):
+        WorkspaceWindow(Workspace(sys.argv[1])).mainloop()
+        sys.exit()
+
+    # 初始化数据跟踪器（旧版本文件在后台升级）
+    try:
+        tracker = ProgressTracker()
+    except ValueError as e:
+        # 例如数据文件版本高于当前程序支持的版本
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("错误", f"无法加载数据文件: {e}")
+        root.destroy()
+        sys.exit(1)
+    tracker.migrate_in_background()
     
     # 如果无数据，创建示例数据
     if not tracker.milestones:
         ms1 = Milestone("基础库学习")
-        task1 = Task("OpenCV基础", time_planned=15, progress=30)
+        task1 = Task("OpenCV基础")  # 父任务的时间和进度由子任务汇总
         task1.links["design_doc"] = "/docs/opencv.md"
         task1.add_subtask(Task("图像读写", time_planned=5, progress=50))
+        task1.add_subtask(Task("图像处理", time_planned=10, progress=20))
         ms1.add_task(task1)
         tracker.milestones.append(ms1)
+        tracker._recalculate_rollups(ms1.tasks)
         tracker.save_data()
     
     # 启动主界面
@@ -0,0 +1,125 @@
+import csv
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from Task import ProgressTracker, Milestone
+
+# ------------------------------
+# 报表：燃尽图 / 速度 / 估算准确度
+# ------------------------------
+# 汇总值只统计叶子任务，避免父任务被 _update_info4subtasks 覆盖后重复计算。
+# 快照格式: {"time": 时间戳, "milestones": {里程碑ID: [计划, 投入, 剩余, 已完成计划, 已完成投入]}}
+PLANNED, SPENT, REMAINING, DONE_PLANNED, DONE_SPENT = range(5)
+DAY = 24 * 3600
+
+
+def milestone_rollup(milestone: Milestone) -> List[float]:
+    """计算里程碑的紧凑汇总值"""
+    rollup = [0.0] * 5
+    stack = list(milestone.tasks)
+    while stack:
+        task = stack.pop()
+        if task.has_children:
+            stack.extend(task.subtasks)
+            continue
+        planned = float(task.time_planned)
+        spent = float(task.time_spent)
+        rollup[PLANNED] += planned
+        rollup[SPENT] += spent
+        if task.status == "DONE":
+            rollup[DONE_PLANNED] += planned
+            rollup[DONE_SPENT] += spent
+        else:
+            rollup[REMAINING] += planned * (100 - float(task.progress)) / 100
+    return rollup
+
+
+class ReportEngine:
+    """基于周期快照的增量报表"""
+    def __init__(self, tracker: ProgressTracker, snapshot_file: Optional[str] = None,
+                 interval: float = DAY):
+        self.tracker = tracker
+        self.snapshot_file = snapshot_file or os.path.splitext(tracker.data_file)[0] + ".snapshots.jsonl"
+        self.interval = interval
+        self.snapshots: List[Tuple[float, Dict[str, List[float]]]] = []
+        self.skipped_lines = 0  # 无法解析而被跳过的快照行数
+        self.load_snapshots()
+
+    def load_snapshots(self) -> None:
+        """读取快照文件（只在初始化时读取一次，之后追加写入并缓存）"""
+        self.snapshots = []
+        self.skipped_lines = 0
+        if not os.path.exists(self.snapshot_file):
+            return
+        with open(self.snapshot_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                # 追加写入被中断时可能留下残缺行，跳过而不是阻止程序启动
+                try:
+                    data = json.loads(line)
+                    snapshot = (float(data["time"]), dict(data["milestones"]))
+                except (ValueError, KeyError, TypeError):
+                    self.skipped_lines += 1
+                    continue
+                self.snapshots.append(snapshot)
+
+    def take_snapshot(self, force: bool = False, now: Optional[float] = None) -> bool:
+        """距上次快照超过 interval 时记录一次快照，返回是否写入"""
+        now = time.time() if now is None else now
+        if not force and self.snapshots and now - self.snapshots[-1][0] < self.interval:
+            return False
+        rollups = {ms.id: milestone_rollup(ms) for ms in self.tracker.milestones}
+        self.snapshots.append((now, rollups))
+        with open(self.snapshot_file, "a", encoding="utf-8") as f:
+            if f.tell() > 0 and not self._ends_with_newline():
+                f.write("\n")  # 上次追加被中断，避免新快照接在残缺行后面
+            f.write(json.dumps({"time": now, "milestones": rollups}))
+            f.write("\n")
+        return True
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.snapshot_file, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _series(self, milestone_id: str) -> List[Tuple[float, List[float]]]:
+        """缓存快照 + 当前状态（增量点）组成的时间序列"""
+        series = [(t, rollups[milestone_id]) for t, rollups in self.snapshots if milestone_id in rollups]
+        milestone = self.tracker.find_milestone(milestone_id)
+        if milestone is not None:
+            series.append((time.time(), milestone_rollup(milestone)))
+        return series
+
+    def burndown(self, milestone_id: str) -> List[Tuple[float, float]]:
+        """燃尽：(时间, 剩余计划小时)"""
+        return [(t, r[REMAINING]) for t, r in self._series(milestone_id)]
+
+    def velocity(self, milestone_id: str, period: float = 7 * DAY) -> List[Tuple[float, float]]:
+        """速度：(周期起点, 该周期内投入小时)"""
+        series = self._series(milestone_id)
+        buckets: Dict[float, float] = {}
+        for (_, prev), (t, cur) in zip(series, series[1:]):
+            start = t - t % period
+            buckets[start] = buckets.get(start, 0.0) + max(0.0, cur[SPENT] - prev[SPENT])
+        return sorted(buckets.items())
+
+    def estimate_accuracy(self, milestone_id: str) -> Optional[float]:
+        """估算准确度：已完成任务 投入/计划 的比值（1.0 为完全准确）"""
+        series = self._series(milestone_id)
+        if not series:
+            return None
+        rollup = series[-1][1]
+        if rollup[DONE_PLANNED] == 0:
+            return None
+        return rollup[DONE_SPENT] / rollup[DONE_PLANNED]
+
+    def export_csv(self, milestone_id: str, path: str) -> None:
+        """导出时间序列到 CSV"""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time", "planned", "spent", "remaining", "done_planned", "done_spent"])
+            for t, r in self._series(milestone_id):
+                writer.writerow([time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))] + r)
@@ -2,7 +2,81 @@ import time
 import json
 import uuid
 import os
-from typing import Dict, List, Optional
+import threading
+import zipfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+# ------------------------------
+# 数据格式版本与迁移
+# ------------------------------
+# 没有 schema_version 的旧文件视为版本 1。
+# 迁移步骤按记录类型（"milestone"/"task"）和起始版本注册，只处理单条记录本身，
+# 在 from_dict 实例化该记录时才执行（惰性迁移），子任务由递归的 from_dict 各自迁移。
+# 同一文件可能被迁移多次（加载时在内存中迁移，后台重写时再迁移一次磁盘数据），
+# 所以迁移结果必须是确定的：每条记录带一个由其在文件中位置得到的 key，补齐的 id 由 key 推导。
+SCHEMA_VERSION = 2
+MIGRATIONS: Dict[Tuple[str, int], Callable[[dict, str], dict]] = {}
+_ID_NAMESPACE = uuid.UUID("6f1c2a8e-4b0d-4f3a-9c5e-2d7b8a1e0f34")
+
+
+def register_migration(record_type: str, from_version: int):
+    """注册从 from_version 升级到 from_version + 1 的迁移步骤，步骤签名为 (data, key) -> data"""
+    def decorator(func: Callable[[dict, str], dict]) -> Callable[[dict, str], dict]:
+        MIGRATIONS[(record_type, from_version)] = func
+        return func
+    return decorator
+
+
+def check_version(version: int) -> None:
+    """拒绝高于当前支持版本的数据"""
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"数据版本 {version} 高于当前支持的版本 {SCHEMA_VERSION}")
+
+
+def upgrade_record(record_type: str, data: dict, version: int, key: str = "") -> dict:
+    """将单条记录从 version 逐级升级到 SCHEMA_VERSION，key 为记录在文件中的稳定位置"""
+    check_version(version)
+    while version < SCHEMA_VERSION:
+        step = MIGRATIONS.get((record_type, version))
+        if step is not None:
+            data = step(data, key)
+        version += 1
+    return data
+
+
+def _default_id(key: str) -> str:
+    """为缺少 id 的旧记录生成 id：有位置 key 时结果确定，否则随机"""
+    if key:
+        return str(uuid.uuid5(_ID_NAMESPACE, key))
+    return str(uuid.uuid4())
+
+
+@register_migration("task", 1)
+def _task_v1_to_v2(data: dict, key: str) -> dict:
+    """版本 1 的任务可能缺少字段，补齐默认值"""
+    data = dict(data)
+    if "id" not in data:
+        data["id"] = _default_id(key)
+    data.setdefault("time_planned", 0)
+    data.setdefault("time_spent", 0)
+    data.setdefault("progress", 0)
+    data.setdefault("next_steps", "")
+    data["links"] = data.get("links") or {"design_doc": "", "notes": "", "deliverables": ""}
+    data.setdefault("subtasks", [])
+    data.setdefault("status", "TODO")
+    data.setdefault("start_time", None)
+    data.setdefault("end_time", None)
+    return data
+
+
+@register_migration("milestone", 1)
+def _milestone_v1_to_v2(data: dict, key: str) -> dict:
+    """版本 1 的里程碑可能缺少 id"""
+    data = dict(data)
+    if "id" not in data:
+        data["id"] = _default_id(key)
+    data.setdefault("tasks", [])
+    return data
 
 # ------------------------------
 # 数据模型类
@@ -65,8 +139,10 @@ class Task:
         }
 
     @classmethod
-    def from_dict(cls, data: dict, parent: Optional["Task"] = None) -> "Task":
-        """从字典创建 Task 对象（递归处理子任务）"""
+    def from_dict(cls, data: dict, parent: Optional["Task"] = None,
+                  version: int = SCHEMA_VERSION, key: str = "") -> "Task":
+        """从字典创建 Task 对象（递归处理子任务，按需迁移旧版本数据）"""
+        data = upgrade_record("task", data, version, key)
         task = cls(
             name=data["name"],
             time_planned=data["time_planned"],
@@ -79,8 +155,8 @@ class Task:
         task.id = data["id"]
         subtasks_data = data.get("subtasks", [])
         task.subtasks = [
-            cls.from_dict(subtask_data, parent=task)  # 关键修复：传递parent=task
-            for subtask_data in subtasks_data
+            cls.from_dict(subtask_data, parent=task, version=version, key=f"{task.id}/{i}")  # 关键修复：传递parent=task
+            for i, subtask_data in enumerate(subtasks_data)
         ]
         task.status = data.get("status", "TODO")
         task.start_time = data.get("start_time")
@@ -99,22 +175,49 @@ class Task:
                     self.time_spent += (self.end_time - self.start_time) / 3600
             self.status = new_status
 
+    # 汇总语义：有子任务的任务，其 time_planned / time_spent / progress 都是子任务的汇总值，
+    # 由 ProgressTracker._update_info4subtasks 写入（load_data 时也会整体重新计算一次），
+    # 父任务自身填写的值不参与合计。因此总时间只累加叶子任务，进度按子任务的总计划时间加权，
+    # 这些计算不依赖父任务当前存储的值是否已更新。
     def calculate_progress(self) -> float:
-        """计算进度（如果是父任务则根据子任务加权平均）"""
+        """计算进度（如果是父任务则按子任务的总计划时间加权平均）"""
         if not self.has_children:
             return float(self.progress)
-        total_weight = sum(t.time_planned for t in self.subtasks)
+        weights = [t.calculate_total_time_planned() for t in self.subtasks]
+        total_weight = sum(weights)
         if total_weight == 0:
             return 0.0
-        return sum(t.calculate_progress() * t.time_planned for t in self.subtasks) / total_weight
+        return sum(t.calculate_progress() * w for t, w in zip(self.subtasks, weights)) / total_weight
 
     def calculate_total_time_planned(self) -> float:
-        """计算总计划时间（递归子任务）"""
-        return self.time_planned + sum(t.calculate_total_time_planned() for t in self.subtasks)
+        """计算总计划时间（父任务的时间是子任务的汇总，只累加叶子任务）"""
+        if not self.has_children:
+            return self.time_planned
+        return sum(t.calculate_total_time_planned() for t in self.subtasks)
 
     def calculate_total_time_spent(self) -> float:
-        """计算总投入时间（递归子任务）"""
-        return self.time_spent + sum(t.calculate_total_time_spent() for t in self.subtasks)
+        """计算总投入时间（父任务的时间是子任务的汇总，只累加叶子任务）"""
+        if not self.has_children:
+            return self.time_spent
+        return sum(t.calculate_total_time_spent() for t in self.subtasks)
+
+def _upgrade_task_tree(data: dict, version: int, key: str = "") -> dict:
+    """升级任务记录及其所有子任务（不创建对象，key 规则与 Task.from_dict 一致）"""
+    data = upgrade_record("task", data, version, key)
+    data["subtasks"] = [
+        _upgrade_task_tree(t, version, f"{data['id']}/{i}") for i, t in enumerate(data.get("subtasks", []))
+    ]
+    return data
+
+
+def _upgrade_milestone_tree(data: dict, version: int, key: str = "") -> dict:
+    """升级里程碑记录及其所有任务（不创建对象，key 规则与 Milestone.from_dict 一致）"""
+    data = upgrade_record("milestone", data, version, key)
+    data["tasks"] = [
+        _upgrade_task_tree(t, version, f"{data['id']}/{i}") for i, t in enumerate(data.get("tasks", []))
+    ]
+    return data
+
 
 class Milestone:
     def __init__(self, name: str, tasks: Optional[List[Task]] = None):
@@ -171,10 +274,14 @@ class Milestone:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Milestone":
+    def from_dict(cls, data: dict, version: int = SCHEMA_VERSION, key: str = "") -> "Milestone":
+        data = upgrade_record("milestone", data, version, key)
         milestone = cls(name=data["name"])
         milestone.id = data["id"]
-        milestone.tasks = [Task.from_dict(t, parent=None) for t in data.get("tasks", [])]
+        milestone.tasks = [
+            Task.from_dict(t, parent=None, version=version, key=f"{milestone.id}/{i}")
+            for i, t in enumerate(data.get("tasks", []))
+        ]
         return milestone
 
     def calculate_total_time_planned(self) -> float:
@@ -192,13 +299,88 @@ class Milestone:
             return 0.0
         return sum(t.calculate_progress() * t.calculate_total_time_planned() for t in self.tasks) / total_weight
 
+    def is_completed(self) -> bool:
+        """所有任务（含子任务）都已完成"""
+        if not self.tasks:
+            return False
+        stack = list(self.tasks)
+        while stack:
+            task = stack.pop()
+            if task.status != "DONE":
+                return False
+            stack.extend(task.subtasks)
+        return True
+
 # ------------------------------
 # 持久化类
 # ------------------------------
+class ArchiveStore:
+    """已归档里程碑的压缩存储（zip，每个里程碑一个成员，按需读取）"""
+    def __init__(self, archive_file: str):
+        self.archive_file = archive_file
+
+    def _member(self, milestone_id: str) -> str:
+        return f"{milestone_id}.json"
+
+    def write(self, milestone: Milestone) -> None:
+        """写入一个里程碑"""
+        self.remove(milestone.id)
+        with zipfile.ZipFile(self.archive_file, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+            data = milestone.to_dict()
+            data["schema_version"] = SCHEMA_VERSION
+            zf.writestr(self._member(milestone.id), json.dumps(data, ensure_ascii=False))
+
+    def read(self, milestone_id: str) -> Optional[Milestone]:
+        """读取一个里程碑"""
+        if not os.path.exists(self.archive_file):
+            return None
+        with zipfile.ZipFile(self.archive_file, "r") as zf:
+            try:
+                data = zf.read(self._member(milestone_id))
+            except KeyError:
+                return None
+        return self._load(data)
+
+    def _load(self, raw: bytes) -> Milestone:
+        data = json.loads(raw.decode("utf-8"))
+        return Milestone.from_dict(data, version=data.get("schema_version", 1))
+
+    def iter_read(self, milestone_ids: List[str]):
+        """依次读取多个里程碑（只打开一次文件）"""
+        if not os.path.exists(self.archive_file):
+            return
+        with zipfile.ZipFile(self.archive_file, "r") as zf:
+            names = set(zf.namelist())
+            for milestone_id in milestone_ids:
+                member = self._member(milestone_id)
+                if member in names:
+                    yield self._load(zf.read(member))
+
+    def remove(self, milestone_id: str) -> None:
+        """删除一个里程碑（zip 不支持删除成员，需要重写文件）"""
+        if not os.path.exists(self.archive_file):
+            return
+        member = self._member(milestone_id)
+        with zipfile.ZipFile(self.archive_file, "r") as zf:
+            if member not in zf.namelist():
+                return
+        tmp_file = self.archive_file + ".tmp"
+        with zipfile.ZipFile(self.archive_file, "r") as src, \
+                zipfile.ZipFile(tmp_file, "w", compression=zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename != member:
+                    dst.writestr(info, src.read(info.filename))
+        os.replace(tmp_file, self.archive_file)
+
+
 class ProgressTracker:
-    def __init__(self, data_file: str = "progress.json"):
+    def __init__(self, data_file: str = "progress.json", archive_file: Optional[str] = None):
         self.data_file = data_file
         self.milestones: List[Milestone] = []
+        self.archive = ArchiveStore(archive_file or os.path.splitext(data_file)[0] + ".archive.zip")
+        self.archived: Dict[str, dict] = {}  # 归档索引：里程碑ID -> 名称和汇总
+        self.schema_version = SCHEMA_VERSION  # 磁盘上文件的版本
+        self._save_lock = threading.Lock()
         self.load_data()
 
     def load_data(self) -> None:
@@ -208,15 +390,62 @@ class ProgressTracker:
 
         with open(self.data_file, "r", encoding="utf-8") as f:
             data = json.load(f)
-            self.milestones = [Milestone.from_dict(ms) for ms in data.get("milestones", [])]
+        version = data.get("schema_version", 1)
+        # 先于任何记录检查文件版本：否则没有记录的新版本文件会被当作旧版本保存，丢失未知字段
+        check_version(version)
+        self.schema_version = version
+        self.milestones = [
+            Milestone.from_dict(ms, version=version, key=f"milestone/{i}")
+            for i, ms in enumerate(data.get("milestones", []))
+        ]
+        self.archived = data.get("archived", {})
+        # 旧文件中父任务可能带有自身填写、未汇总的时间和进度，加载时统一以子任务为准
+        for ms in self.milestones:
+            self._recalculate_rollups(ms.tasks)
 
     def save_data(self) -> None:
-        """保存数据到 JSON 文件"""
+        """保存数据到 JSON 文件（总是写入当前版本）"""
         data = {
-            "milestones": [ms.to_dict() for ms in self.milestones]
+            "schema_version": SCHEMA_VERSION,
+            "milestones": [ms.to_dict() for ms in self.milestones],
+            "archived": self.archived
         }
-        with open(self.data_file, "w", encoding="utf-8") as f:
+        with self._save_lock:
+            with open(self.data_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.schema_version = SCHEMA_VERSION
+
+    def migrate_in_background(self) -> Optional[threading.Thread]:
+        """
+        在后台线程中把旧版本文件重写为当前版本，不阻塞界面。
+
+        重写基于磁盘上的原始数据逐条升级；若期间前台已经保存过（文件已是新版本），则放弃重写。
+        """
+        if self.schema_version >= SCHEMA_VERSION or not os.path.exists(self.data_file):
+            return None
+        thread = threading.Thread(target=self._rewrite_file, daemon=True)
+        thread.start()
+        return thread
+
+    def _rewrite_file(self) -> None:
+        mtime = os.path.getmtime(self.data_file)
+        with open(self.data_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        version = data.get("schema_version", 1)
+        data["milestones"] = [
+            _upgrade_milestone_tree(ms, version, f"milestone/{i}") for i, ms in enumerate(data.get("milestones", []))
+        ]
+        data["schema_version"] = SCHEMA_VERSION
+
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
+        with self._save_lock:
+            if os.path.getmtime(self.data_file) != mtime or self.schema_version >= SCHEMA_VERSION:
+                os.remove(tmp_file)
+                return
+            os.replace(tmp_file, self.data_file)
+            self.schema_version = SCHEMA_VERSION
 
     def find_milestone(self, milestone_id: str) -> Optional[Milestone]:
         """通过 ID 查找里程碑"""
@@ -252,12 +481,97 @@ class ProgressTracker:
                 return True
         return False
     
+    def archive_milestone(self, milestone_id: str, save: bool = True) -> bool:
+        """将里程碑移入归档存储，只在内存中保留索引"""
+        milestone = self.find_milestone(milestone_id)
+        if milestone is None:
+            return False
+        self.archive.write(milestone)
+        self.archived[milestone.id] = {
+            "name": milestone.name,
+            "archived_at": time.time(),
+            "time_planned": milestone.calculate_total_time_planned(),
+            "time_spent": milestone.calculate_total_time_spent(),
+            "progress": milestone.calculate_overall_progress(),
+        }
+        self.remove_milestone(milestone_id)
+        if save:
+            self.save_data()
+        return True
+
+    def archive_completed(self) -> List[str]:
+        """归档所有任务均已完成的里程碑，返回归档的里程碑ID"""
+        ids = [ms.id for ms in self.milestones if ms.is_completed()]
+        for milestone_id in ids:
+            self.archive_milestone(milestone_id, save=False)
+        if ids:
+            self.save_data()
+        return ids
+
+    def load_archived(self, milestone_id: str) -> Optional[Milestone]:
+        """按需读取归档的里程碑（只读查看，不放回工作集）"""
+        if milestone_id not in self.archived:
+            return None
+        return self.archive.read(milestone_id)
+
+    def unarchive_milestone(self, milestone_id: str) -> bool:
+        """取消归档，放回工作集（里程碑或任务 ID 与工作集冲突时抛出 ValueError）"""
+        milestone = self.load_archived(milestone_id)
+        if milestone is None:
+            return False
+        if self.find_milestone(milestone.id) is not None:
+            raise ValueError(f"工作集中已存在相同 ID 的里程碑: {milestone.id}")
+        working_ids = set()
+        for ms in self.milestones:
+            stack = list(ms.tasks)
+            while stack:
+                task = stack.pop()
+                working_ids.add(task.id)
+                stack.extend(task.subtasks)
+        stack = list(milestone.tasks)
+        while stack:
+            task = stack.pop()
+            if task.id in working_ids:
+                raise ValueError(f"工作集中已存在相同 ID 的任务: {task.name}")
+            stack.extend(task.subtasks)
+        self.milestones.append(milestone)
+        del self.archived[milestone_id]
+        self.save_data()
+        self.archive.remove(milestone_id)
+        return True
+
+    def search_archive(self, keyword: str) -> List[str]:
+        """在归档中搜索里程碑名称或任务名称，返回匹配的里程碑ID"""
+        result = [ms_id for ms_id, info in self.archived.items() if keyword in info["name"]]
+        rest = [ms_id for ms_id in self.archived if ms_id not in result]
+        for milestone in self.archive.iter_read(rest):
+            stack = list(milestone.tasks)
+            while stack:
+                task = stack.pop()
+                if keyword in task.name:
+                    result.append(milestone.id)
+                    break
+                stack.extend(task.subtasks)
+        return result
+
     def _update_info4subtasks(self, task: Task):
         if task.has_children:
             task.time_planned = sum(t.calculate_total_time_planned() for t in task.subtasks)
             task.time_spent = sum(t.calculate_total_time_spent() for t in task.subtasks)
             task.progress = task.calculate_progress()
 
+    def _recalculate_rollups(self, tasks: List[Task]) -> None:
+        """自底向上重新计算 tasks 及其所有子任务的汇总值"""
+        order = []
+        stack = list(tasks)
+        while stack:
+            task = stack.pop()
+            order.append(task)
+            stack.extend(task.subtasks)
+        # 先序的逆序保证子任务总在父任务之前处理
+        for task in reversed(order):
+            self._update_info4subtasks(task)
+
     def remove_task(self, task_id: str) -> bool:
         """全局删除任务（跨里程碑）"""
         for milestone in self.milestones:
@@ -268,17 +582,15 @@ class ProgressTracker:
                 # 查找被删除任务的父任务（通过任务引用）
                 deleted_task = self.find_task(task_id)  # 假设任务未完全从内存清除
                 if parent:
-                    self._update_info4subtasks(parent)
+                    self._propagate_time_update(parent)
                 self.save_data()
                 return True
         return False
 
     def _propagate_time_update(self, task: Task):
-        """递归向上更新父任务时间"""
-        # 实现逻辑需根据数据结构补充父任务引用
-        # 此处假设每个任务存储了parent引用
+        """递归向上更新父任务时间（包括顶层任务）"""
         current = task
-        while current.parent is not None:
+        while current is not None:
             self._update_info4subtasks(current)
             current = current.parent
 
@@ -301,12 +613,14 @@ if __name__ == "__main__":
 
     # 创建示例数据
     milestone = Milestone("基础库学习")
-    task1 = Task("OpenCV基础", time_planned=15, progress=30)
+    task1 = Task("OpenCV基础")  # 父任务的时间和进度由子任务汇总
     task1.links["design_doc"] = "/docs/opencv.md"
     task1.add_subtask(Task("图像读写", time_planned=5, progress=50))
+    task1.add_subtask(Task("图像处理", time_planned=10, progress=20))
     
     milestone.add_task(task1)
     tracker.milestones.append(milestone)
+    tracker._recalculate_rollups(milestone.tasks)
     tracker.save_data()
 
     # 重新加载验证
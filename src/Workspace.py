@@ -0,0 +1,152 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from Task import ProgressTracker
+from Report import milestone_rollup, PLANNED, SPENT, REMAINING
+
+# ------------------------------
+# 多项目工作区
+# ------------------------------
+def weighted_progress(milestones: List[dict]) -> float:
+    """按计划时间加权的进度，与 Milestone.calculate_overall_progress 的定义一致"""
+    total_weight = sum(m["planned"] for m in milestones)
+    if total_weight == 0:
+        return 0.0
+    return sum(m["progress"] * m["planned"] for m in milestones) / total_weight
+
+
+def summarize_file(path: str) -> dict:
+    """在子进程中加载单个跟踪文件，只返回紧凑的汇总结果"""
+    mtime = os.path.getmtime(path)
+    tracker = ProgressTracker(path)
+    milestones = []
+    for ms in tracker.milestones:
+        rollup = milestone_rollup(ms)
+        milestones.append({
+            "id": ms.id,
+            "name": ms.name,
+            "progress": ms.calculate_overall_progress(),
+            "planned": rollup[PLANNED],
+            "spent": rollup[SPENT],
+            "remaining": rollup[REMAINING],
+        })
+    # 归档的里程碑不在工作集中，只从归档索引取汇总，单独列出
+    archived = tracker.archived.values()
+    return {
+        "path": path,
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "mtime": mtime,
+        "milestones": milestones,
+        "progress": weighted_progress(milestones),
+        "planned": sum(m["planned"] for m in milestones),
+        "spent": sum(m["spent"] for m in milestones),
+        "remaining": sum(m["remaining"] for m in milestones),
+        "archived": {
+            "milestones": len(archived),
+            "planned": sum(info.get("time_planned", 0) for info in archived),
+            "spent": sum(info.get("time_spent", 0) for info in archived),
+        },
+    }
+
+
+class Workspace:
+    """管理一个目录下的多个跟踪文件（每个团队一个文件）"""
+    def __init__(self, root: str, pattern: str = "*.json", max_workers: Optional[int] = None):
+        self.root = root
+        self.pattern = pattern
+        self.max_workers = max_workers
+        self.summaries: Dict[str, dict] = {}  # path -> 汇总结果
+        self.errors: Dict[str, str] = {}      # path -> 加载错误
+        self._error_mtimes: Dict[str, float] = {}
+
+    def discover(self) -> List[str]:
+        """查找工作区内的跟踪文件"""
+        return sorted(glob.glob(os.path.join(self.root, self.pattern)))
+
+    def refresh(self) -> List[str]:
+        """重新加载 mtime 发生变化的文件，返回本次重新读取的文件列表"""
+        paths = self.discover()
+        for path in list(self.summaries):
+            if path not in paths:
+                del self.summaries[path]
+        for path in list(self.errors):
+            if path not in paths:
+                del self.errors[path]
+                del self._error_mtimes[path]
+
+        stale = []
+        for path in paths:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                # discover 之后文件被删除或改名
+                self._drop(path)
+                continue
+            cached = self.summaries.get(path)
+            if cached is not None and cached["mtime"] == mtime:
+                continue
+            if self._error_mtimes.get(path) == mtime:
+                continue
+            stale.append(path)
+
+        if len(stale) == 1:
+            self._collect(stale, [self._safe_summarize(stale[0])])
+        elif stale:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(summarize_file, path) for path in stale]
+                results = []
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append(e)
+            self._collect(stale, results)
+        return stale
+
+    def _safe_summarize(self, path: str):
+        try:
+            return summarize_file(path)
+        except Exception as e:
+            return e
+
+    def _collect(self, paths: List[str], results: list) -> None:
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                try:
+                    mtime = os.path.getmtime(path)
+                except OSError:
+                    # 加载期间文件被删除或改名
+                    self._drop(path)
+                    continue
+                self.summaries.pop(path, None)
+                self.errors[path] = str(result)
+                self._error_mtimes[path] = mtime
+            else:
+                self.errors.pop(path, None)
+                self._error_mtimes.pop(path, None)
+                self.summaries[path] = result
+
+    def _drop(self, path: str) -> None:
+        self.summaries.pop(path, None)
+        self.errors.pop(path, None)
+        self._error_mtimes.pop(path, None)
+
+    def projects(self) -> List[dict]:
+        """按文件路径排序的项目汇总"""
+        return [self.summaries[path] for path in sorted(self.summaries)]
+
+    def totals(self) -> dict:
+        """所有项目的合计"""
+        projects = self.projects()
+        return {
+            "projects": len(projects),
+            "milestones": sum(len(p["milestones"]) for p in projects),
+            "planned": sum(p["planned"] for p in projects),
+            "spent": sum(p["spent"] for p in projects),
+            "remaining": sum(p["remaining"] for p in projects),
+            "archived_milestones": sum(p["archived"]["milestones"] for p in projects),
+            "archived_planned": sum(p["archived"]["planned"] for p in projects),
+            "archived_spent": sum(p["archived"]["spent"] for p in projects),
+        }